@@ -10,6 +10,9 @@ load_dotenv()
 lm = dspy.LM("openai/gpt-4o", api_key=os.getenv('OPENAI_API_KEY'), temperature=0)
 dspy.configure(lm=lm)
 
+# Cheaper model for auxiliary calls such as condensing oversized inputs
+cheap_lm = dspy.LM("openai/gpt-4o-mini", api_key=os.getenv('OPENAI_API_KEY'), temperature=0)
+
     
 def ai(user_prompt: str, system_prompt: Optional[str] = None):
     class QA(dspy.Signature):
@@ -1,12 +1,27 @@
-from models import Run, EvalResult, eval_function
+from models import Task, Run, EvalResult, eval_function
 from pathlib import Path
 import sys
 import os
 import json
-from typing import Optional, List
+import hashlib
+import tempfile
+import functools
+import asyncio
+from typing import Optional, List, Tuple, Dict, Callable
 from pydantic import BaseModel, Field
 
-from ai import dspy
+from ai import dspy, cheap_lm
+import tiktoken
+
+# On-disk cache of evaluations keyed by their inputs; set to None to disable
+CACHE_DIR: Optional[Path] = Path(__file__).parent / ".cache" / "eval"
+
+# Agent answers longer than this many tokens are summarized with the cheap model before evaluation
+MAX_ANSWER_TOKENS = 8000
+
+# Answers longer than this are cut to their first TRIM_HEAD_CHARS and last TRIM_TAIL_CHARS characters
+TRIM_HEAD_CHARS = 6000
+TRIM_TAIL_CHARS = 2000
 
 class EvaluationResult(BaseModel):
     """Structured evaluation result from DSPy."""
@@ -21,8 +36,9 @@ class EvaluationResult(BaseModel):
     total_score: int = Field(description="Total score (sum of all criteria)")
     overall_assessment: str = Field(description="2-3 sentence summary of the evaluation")
 
+@functools.lru_cache(maxsize=512)
 def get_source_answer(task_id: str) -> str:
-    """Load the source answer for the given task."""
+    """Load the source answer for the given task. Source answers are read-only, so reads are memoized."""
     eval_dir = Path(__file__).parent
     source_file = eval_dir / "dataset_from_dspy" / "source_answers" / f"{task_id}.md"
     
@@ -31,124 +47,379 @@ def get_source_answer(task_id: str) -> str:
     
     return source_file.read_text()
 
+# Common agent output files, in order of preference
+OUTPUT_FILES = (
+    "answer.txt", "analysis.md", "response.txt", "output.txt",
+    "result.md", "solution.txt", "findings.txt", "agent_output.txt"
+)
+
 def get_agent_answer(run: Run) -> str:
     """Get the agent's answer from the run."""
-    # First check if a specific agent answer path is provided
-    if run.agent_answer_path and Path(run.agent_answer_path).exists():
-        return Path(run.agent_answer_path).read_text()
-    
-    # Otherwise look for common agent output files in the env path
-    env_path = Path(run.env_path)
-    output_files = [
-        "answer.txt", "analysis.md", "response.txt", "output.txt",
-        "result.md", "solution.txt", "findings.txt", "agent_output.txt"
-    ]
-    
-    for filename in output_files:
-        file_path = env_path / filename
-        if file_path.exists():
-            return file_path.read_text()
+    # Use the answer text directly if the caller already has it
+    if run.agent_answer is not None:
+        return run.agent_answer
+    
+    # Then check if a specific agent answer path is provided
+    if run.agent_answer_path:
+        try:
+            return Path(run.agent_answer_path).read_text()
+        except FileNotFoundError:
+            pass
+    
+    # Otherwise look for common agent output files in the env path, listing it once
+    try:
+        with os.scandir(run.env_path) as entries:
+            files = {entry.name: entry.path for entry in entries if entry.is_file()}
+    except (FileNotFoundError, NotADirectoryError):
+        files = {}
+    
+    for filename in OUTPUT_FILES:
+        if filename in files:
+            return Path(files[filename]).read_text()
     
     # If no specific output file found, return indication
     return "No agent answer file found. Agent may have provided answer in terminal output only."
 
 # DSPy evaluation using the EvaluationResult model
 
+class EvaluateGitQA(dspy.Signature):
+    """Evaluate an AI agent's git repository analysis against a reference answer.
+    
+    Evaluate the agent's answer against the expected source answer on 4 criteria:
+    1. Pattern Recognition (0-25): Does the agent identify recurring patterns across multiple issues/commits?
+    2. Specific Evidence (0-25): Does the agent provide specific issue numbers, PR numbers, and commit evidence?
+    3. Root Cause Analysis (0-25): Does the agent explain underlying causes, not just symptoms?
+    4. Actionable Insights (0-25): Does the agent provide practical recommendations or solutions?
+    
+    For each criterion: 25=Excellent, 20=Good, 15=Fair, 10=Poor, 0=Missing.
+    Put your reasoning for each score in that criterion's justification field, and your
+    overall reasoning in the overall assessment.
+    """
+    
+    # Inputs are ordered from most to least shared across calls (the rubric above always comes
+    # first) so provider prompt caching can reuse the longest possible identical prefix.
+    task_id: str = dspy.InputField(desc="The task identifier")
+    source_answer: str = dspy.InputField(desc="The expected reference answer")
+    agent_answer: str = dspy.InputField(desc="The agent's actual answer")
+    
+    evaluation_result: EvaluationResult = dspy.OutputField(desc="Structured evaluation result")
+
+
+# Built once and shared by every evaluation; DSPy modules are safe to call from multiple threads.
+# The justification fields already carry the reasoning, so a separate chain-of-thought field is
+# skipped by default (main() switches to dspy.ChainOfThought with --use-cot).
+evaluator = dspy.Predict(EvaluateGitQA)
+
+
+@functools.lru_cache(maxsize=1)
+def rubric_fingerprint() -> str:
+    """Serialize everything in the EvaluateGitQA signature that shapes a score: instructions, fields and output schema."""
+    return json.dumps({
+        "instructions": EvaluateGitQA.instructions,
+        "fields": {name: field.json_schema_extra for name, field in EvaluateGitQA.fields.items()},
+        "output_schema": EvaluationResult.model_json_schema()
+    }, sort_keys=True)
+
+
+@functools.lru_cache(maxsize=1)
+def summarizer_fingerprint() -> str:
+    """Serialize the SummarizeAnswer instructions and fields, which shape what the evaluator sees of long answers."""
+    return json.dumps({
+        "instructions": SummarizeAnswer.instructions,
+        "fields": {name: field.json_schema_extra for name, field in SummarizeAnswer.fields.items()}
+    }, sort_keys=True)
+
+
+def cache_key(task_id: str, source_answer: str, agent_answer: str) -> str:
+    """Content hash identifying an evaluation's inputs and everything that scored them.
+    
+    Covers the evaluator mode, the rubric and the evaluator model, plus the trimming and
+    summarization settings that shape the answers the evaluator sees, so changing any of them
+    invalidates earlier cached scores instead of silently replaying them.
+    """
+    parts = (
+        type(evaluator).__name__,
+        rubric_fingerprint(),
+        dspy.settings.lm.model,
+        str(MAX_ANSWER_TOKENS),
+        str(TRIM_HEAD_CHARS),
+        str(TRIM_TAIL_CHARS),
+        cheap_lm.model,
+        summarizer_fingerprint(),
+        task_id,
+        source_answer,
+        agent_answer
+    )
+    return hashlib.sha256("\x00".join(parts).encode()).hexdigest()
+
+
+def load_cached_evaluation(key: str) -> Optional[Tuple[EvaluationResult, int]]:
+    """Return the cached (evaluation, agent answer token count) for `key`, or None on a miss."""
+    if CACHE_DIR is None:
+        return None
+    
+    cache_file = CACHE_DIR / f"{key}.json"
+    try:
+        with open(cache_file, 'r') as f:
+            entry = json.load(f)
+        return EvaluationResult(**entry["evaluation_result"]), entry["agent_answer_tokens"]
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Ignoring unreadable cache entry {cache_file}: {e}")
+        return None
+
+
+def save_cached_evaluation(key: str, evaluation_result: EvaluationResult, agent_answer_tokens: int) -> None:
+    """Persist an evaluation and the agent answer's token count, atomically replacing any existing entry.
+    
+    The cache is best-effort: a failed write is logged and does not fail the evaluation.
+    """
+    if CACHE_DIR is None:
+        return
+    
+    cache_file = CACHE_DIR / f"{key}.json"
+    temp_path = None
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=CACHE_DIR, suffix=".tmp", delete=False) as f:
+            temp_path = Path(f.name)
+            json.dump({"evaluation_result": evaluation_result.model_dump(), "agent_answer_tokens": agent_answer_tokens}, f)
+        os.replace(temp_path, cache_file)
+    except Exception as e:
+        print(f"Could not write cache entry {cache_file}: {e}")
+        if temp_path is not None:
+            temp_path.unlink(missing_ok=True)
+
+
+def trim_answer(text: str) -> str:
+    """Bound an answer's length for the evaluator prompt, keeping its beginning and end."""
+    head, tail = TRIM_HEAD_CHARS, TRIM_TAIL_CHARS
+    if len(text) <= head + tail + 64:
+        return text
+    return text[:head] + f"\n...[{len(text) - head - tail} chars truncated]...\n" + text[-tail:]
+
+
+@functools.lru_cache(maxsize=1)
+def get_encoding() -> Optional[tiktoken.Encoding]:
+    """Load the tokenizer used to measure answer lengths (o200k_base is the gpt-4o encoding).
+    
+    tiktoken downloads encodings on first use; returns None if that is not possible.
+    """
+    try:
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        print(f"Could not load tiktoken encoding, estimating token counts instead: {e}")
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in `text`, estimating ~4 characters per token if no tokenizer is available."""
+    encoding = get_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+class SummarizeAnswer(dspy.Signature):
+    """Condense an AI agent's analysis of a git repository without losing substance.
+    
+    Keep every pattern, root cause, recommendation and piece of specific evidence
+    (issue/PR numbers, commits, files, people, dates). Drop repetition and filler.
+    """
+    
+    answer: str = dspy.InputField(desc="The agent's full answer")
+    summary: str = dspy.OutputField(desc="The condensed answer, at most 1500 words")
+
+
+summarizer = dspy.Predict(SummarizeAnswer)
+
+
+def bound_agent_answer(agent_answer: str) -> Tuple[str, int]:
+    """Fit an agent answer into the evaluator prompt, summarizing it first if it exceeds MAX_ANSWER_TOKENS.
+    
+    Returns the bounded answer and the original answer's token count.
+    """
+    agent_answer_tokens = count_tokens(agent_answer)
+    if agent_answer_tokens > MAX_ANSWER_TOKENS:
+        with dspy.context(lm=cheap_lm):
+            agent_answer = summarizer(answer=agent_answer).summary
+    return trim_answer(agent_answer), agent_answer_tokens
+
+
+def prepare_run(run: Run) -> tuple[str, str, str]:
+    """Collect the (task_id, source_answer, agent_answer) inputs for evaluating a run."""
+    return run.task_id, get_source_answer(run.task_id), get_agent_answer(run)
+
+
+def to_eval_result(task_id: str, source_answer: str, agent_answer: str, agent_answer_tokens: int, evaluation_result: EvaluationResult) -> EvalResult:
+    """Convert a structured DSPy evaluation into an EvalResult."""
+    # Normalize to 0-1 range
+    normalized_score = evaluation_result.total_score / 100.0
+    
+    agent_answer_summarized = agent_answer_tokens > MAX_ANSWER_TOKENS
+    
+    return EvalResult(
+        score=normalized_score,
+        details={
+            "pattern_recognition": evaluation_result.pattern_recognition,
+            "pattern_recognition_justification": evaluation_result.pattern_recognition_justification,
+            "specific_evidence": evaluation_result.specific_evidence,
+            "specific_evidence_justification": evaluation_result.specific_evidence_justification,
+            "root_cause_analysis": evaluation_result.root_cause_analysis,
+            "root_cause_analysis_justification": evaluation_result.root_cause_analysis_justification,
+            "actionable_insights": evaluation_result.actionable_insights,
+            "actionable_insights_justification": evaluation_result.actionable_insights_justification,
+            "total_score": evaluation_result.total_score,
+            "overall_assessment": evaluation_result.overall_assessment,
+            "source_answer_length": len(source_answer),
+            "agent_answer_length": len(agent_answer),
+            "source_answer_evaluated_length": len(trim_answer(source_answer)),
+            "agent_answer_tokens": agent_answer_tokens,
+            "agent_answer_summarized": agent_answer_summarized,
+            # A summarized answer's length is only known when it is produced
+            "agent_answer_evaluated_length": None if agent_answer_summarized else len(trim_answer(agent_answer)),
+            "task_id": task_id
+        }
+    )
+
+
+def error_eval_result(task_id: str, source_answer: str, agent_answer: str, error: str) -> EvalResult:
+    """Build a zero-score EvalResult for an evaluation that failed."""
+    return EvalResult(
+        score=0.0,
+        details={
+            "error": error,
+            "task_id": task_id,
+            "source_answer_length": len(source_answer),
+            "agent_answer_length": len(agent_answer)
+        }
+    )
+
+
 @eval_function
 def evaluate_git_qa(run: Run) -> EvalResult:
-    """Evaluate git repository Q&A task using DSPy structured output."""
+    """Evaluate git repository Q&A task using DSPy structured output.
     
-    task_id = run.task_id
+    Never raises: any failure, including reading an unreadable answer file, yields a zero-score result.
+    """
     
-    # Get source and agent answers
-    source_answer = get_source_answer(task_id)
-    agent_answer = get_agent_answer(run)
+    # Empty until read, so a failure while reading them reports zero lengths
+    task_id, source_answer, agent_answer = run.task_id, "", ""
     
-    # Use DSPy for structured evaluation
     try:
-        # Create a DSPy signature for evaluation
-        class EvaluateGitQA(dspy.Signature):
-            """Evaluate an AI agent's git repository analysis against a reference answer.
-            
-            Evaluate the agent's answer against the expected source answer on 4 criteria:
-            1. Pattern Recognition (0-25): Does the agent identify recurring patterns across multiple issues/commits?
-            2. Specific Evidence (0-25): Does the agent provide specific issue numbers, PR numbers, and commit evidence?
-            3. Root Cause Analysis (0-25): Does the agent explain underlying causes, not just symptoms?
-            4. Actionable Insights (0-25): Does the agent provide practical recommendations or solutions?
-            
-            For each criterion: 25=Excellent, 20=Good, 15=Fair, 10=Poor, 0=Missing.
-            """
-            
-            task_id: str = dspy.InputField(desc="The task identifier")
-            source_answer: str = dspy.InputField(desc="The expected reference answer")
-            agent_answer: str = dspy.InputField(desc="The agent's actual answer")
-            
-            evaluation_result: EvaluationResult = dspy.OutputField(desc="Structured evaluation result")
-
-        evaluator = dspy.ChainOfThought(EvaluateGitQA)
+        # Get source and agent answers
+        task_id, source_answer, agent_answer = prepare_run(run)
         
+        key = cache_key(task_id, source_answer, agent_answer)
+        cached = load_cached_evaluation(key)
+        if cached is not None:
+            evaluation_result, agent_answer_tokens = cached
+            return to_eval_result(task_id, source_answer, agent_answer, agent_answer_tokens, evaluation_result)
+        
+        # Use DSPy for structured evaluation
+        bounded_agent_answer, agent_answer_tokens = bound_agent_answer(agent_answer)
         result = evaluator(
             task_id=task_id,
-            source_answer=source_answer,
-            agent_answer=agent_answer
+            source_answer=trim_answer(source_answer),
+            agent_answer=bounded_agent_answer
         )
         
-        evaluation_result = result.evaluation_result
-        
-        # Normalize to 0-1 range
-        normalized_score = evaluation_result.total_score / 100.0
-        
-        return EvalResult(
-            score=normalized_score,
-            details={
-                "pattern_recognition": evaluation_result.pattern_recognition,
-                "pattern_recognition_justification": evaluation_result.pattern_recognition_justification,
-                "specific_evidence": evaluation_result.specific_evidence,
-                "specific_evidence_justification": evaluation_result.specific_evidence_justification,
-                "root_cause_analysis": evaluation_result.root_cause_analysis,
-                "root_cause_analysis_justification": evaluation_result.root_cause_analysis_justification,
-                "actionable_insights": evaluation_result.actionable_insights,
-                "actionable_insights_justification": evaluation_result.actionable_insights_justification,
-                "total_score": evaluation_result.total_score,
-                "overall_assessment": evaluation_result.overall_assessment,
-                "source_answer_length": len(source_answer),
-                "agent_answer_length": len(agent_answer),
-                "task_id": task_id
-            }
-        )
+        save_cached_evaluation(key, result.evaluation_result, agent_answer_tokens)
+        return to_eval_result(task_id, source_answer, agent_answer, agent_answer_tokens, result.evaluation_result)
         
     except Exception as e:
-        return EvalResult(
-            score=0.0,
-            details={
-                "error": str(e),
-                "task_id": task_id,
-                "source_answer_length": len(source_answer),
-                "agent_answer_length": len(agent_answer)
-            }
-        )
+        return error_eval_result(task_id, source_answer, agent_answer, str(e))
+
 
+# Async variant of evaluate_git_qa: runs it in a worker thread that inherits the caller's DSPy settings
+evaluate_git_qa_async = dspy.asyncify(evaluate_git_qa)
 
-def load_tasks() -> List[dict]:
-    """Load tasks from the dataset."""
+
+async def evaluate_runs_async(
+    runs: List[Run],
+    max_concurrency: int = 32,
+    on_result: Optional[Callable[[int, EvalResult], None]] = None
+) -> List[EvalResult]:
+    """Evaluate runs concurrently on one event loop, with at most `max_concurrency` in flight.
+    
+    Results are returned in the same order as `runs`. If given, `on_result(index, result)` is
+    called on the event loop as each run finishes.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    
+    async def evaluate(i: int) -> EvalResult:
+        async with semaphore:
+            result = await evaluate_git_qa_async(runs[i])
+        if on_result:
+            on_result(i, result)
+        return result
+    
+    # Start runs grouped by task so runs sharing a source answer are sent back to back
+    # and hit the provider's prompt cache
+    order = sorted(range(len(runs)), key=lambda i: runs[i].task_id)
+    tasks = [None] * len(runs)
+    with dspy.context(async_max_workers=max_concurrency):
+        for i in order:
+            tasks[i] = asyncio.ensure_future(evaluate(i))
+        return list(await asyncio.gather(*tasks))
+
+
+def evaluate_git_qa_batch(
+    runs: List[Run],
+    num_threads: int = 16,
+    on_result: Optional[Callable[[int, EvalResult], None]] = None
+) -> List[EvalResult]:
+    """Evaluate many runs concurrently.
+    
+    Results are returned in the same order as `runs`. A run whose evaluation fails
+    gets a zero-score result instead of aborting the whole batch. If given,
+    `on_result(index, result)` is called as each run finishes.
+    """
+    return asyncio.run(evaluate_runs_async(runs, max_concurrency=num_threads, on_result=on_result))
+
+
+@functools.lru_cache(maxsize=1)
+def load_tasks() -> Tuple[Task, ...]:
+    """Load tasks from the dataset. The file is read once per process; the result is shared, so it is a tuple."""
     tasks_file = Path(__file__).parent / "dataset_from_dspy" / "questions.json"
     if not tasks_file.exists():
         raise FileNotFoundError(f"Tasks file not found: {tasks_file}")
     
     with open(tasks_file, 'r') as f:
-        return json.load(f)
+        return tuple(Task.from_dict(task_data) for task_data in json.load(f))
+
+
+@functools.lru_cache(maxsize=1)
+def load_tasks_by_id() -> Dict[str, Task]:
+    """Index the dataset's tasks by task_id."""
+    return {task.task_id: task for task in load_tasks()}
 
 
-def evaluate_task(task_data: dict, env_path: str = None, agent_answer_path: str = None) -> EvalResult:
-    """Evaluate a single task."""
-    run = Run(
-        task_id=task_data["task_id"],
-        task=task_data["task"],
-        env_path=env_path or f"./envs/{task_data['task_id']}",
-        agent_answer_path=agent_answer_path
+def get_task(task_id: str) -> Optional[Task]:
+    """Look up a task by ID, or return None if there is no such task."""
+    return load_tasks_by_id().get(task_id)
+
+
+def make_run(task_data: Task, env_path: str = None, agent_answer_path: str = None, agent_answer: str = None) -> Run:
+    """Build the Run for a task."""
+    return Run(
+        task_id=task_data.task_id,
+        task=task_data.task,
+        env_path=env_path or f"./envs/{task_data.task_id}",
+        agent_answer_path=agent_answer_path,
+        agent_answer=agent_answer
     )
-    
-    return evaluate_git_qa(run)
+
+
+def evaluate_task(task_data: Task, env_path: str = None, agent_answer_path: str = None, agent_answer: str = None) -> EvalResult:
+    """Evaluate a single task. `agent_answer` is the answer text itself, for callers that have already read it."""
+    return evaluate_git_qa(make_run(task_data, env_path, agent_answer_path, agent_answer))
+
+
+async def evaluate_task_async(task_data: Task, env_path: str = None, agent_answer_path: str = None, agent_answer: str = None) -> EvalResult:
+    """Evaluate a single task without blocking the event loop, so independent evaluations can be gathered."""
+    return await evaluate_git_qa_async(make_run(task_data, env_path, agent_answer_path, agent_answer))
 
 
 def main():
@@ -156,19 +427,32 @@ def main():
     import argparse
     import json
     
+    global CACHE_DIR, evaluator
+    
     parser = argparse.ArgumentParser(description="Evaluate git-qa-benchmark tasks")
     parser.add_argument("--task-id", help="Specific task ID to evaluate")
     parser.add_argument("--env-path", help="Path to the environment directory")
     parser.add_argument("--agent-answer", help="Path to the agent's answer file")
     parser.add_argument("--output", help="Output file for results (JSON)")
+    parser.add_argument("--num-threads", type=int, default=8, help="Number of tasks to evaluate concurrently (default: 8)")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every evaluation instead of reusing cached results")
+    parser.add_argument("--use-cot", action="store_true", help="Evaluate with dspy.ChainOfThought instead of dspy.Predict")
     args = parser.parse_args()
     
+    if args.use_cot:
+        evaluator = dspy.ChainOfThought(EvaluateGitQA)
+    
+    if args.no_cache:
+        CACHE_DIR = None
+        if hasattr(dspy, "configure_cache"):
+            dspy.configure_cache(enable_disk_cache=False, enable_memory_cache=False)
+    
     # Load tasks
     tasks = load_tasks()
     
     if args.task_id:
         # Evaluate specific task
-        task_data = next((task for task in tasks if task["task_id"] == args.task_id), None)
+        task_data = get_task(args.task_id)
         if not task_data:
             print(f"Task {args.task_id} not found")
             return
@@ -187,30 +471,51 @@ def main():
                     "details": result.details
                 }, f, indent=2)
     else:
-        # Evaluate all tasks
-        print(f"Evaluating {len(tasks)} tasks...")
-        results = []
-        
-        for task_data in tasks:
-            print(f"Evaluating: {task_data['task_id']}")
-            try:
-                result = evaluate_task(task_data, args.env_path)
-                results.append({
-                    "task_id": task_data["task_id"],
-                    "score": result.score,
-                    "details": result.details
-                })
-                print(f"  Score: {result.score:.2f}")
-            except Exception as e:
-                print(f"  Error: {e}")
-                results.append({
-                    "task_id": task_data["task_id"],
-                    "score": 0.0,
-                    "error": str(e)
-                })
-        
-        # Calculate average score
-        valid_scores = [r["score"] for r in results if "error" not in r]
+        # Results are appended to a JSON Lines file as they complete, so an interrupted run
+        # can be resumed without re-evaluating (and re-paying for) finished tasks
+        results_by_id = {}
+        partial_path = Path(args.output).with_suffix(".partial.jsonl") if args.output else None
+        if partial_path and partial_path.exists():
+            with open(partial_path, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        results_by_id[entry["task_id"]] = entry
+            print(f"Resuming: {len(results_by_id)} tasks already evaluated in {partial_path}")
+        
+        pending = [task_data for task_data in tasks if task_data.task_id not in results_by_id]
+        
+        # Evaluate remaining tasks concurrently; each evaluation is dominated by LLM latency
+        print(f"Evaluating {len(pending)} tasks with {args.num_threads} threads...")
+        runs = [make_run(task_data, args.env_path) for task_data in pending]
+        
+        partial_file = open(partial_path, 'a') if partial_path else None
+        
+        def record_result(i: int, result: EvalResult) -> None:
+            task_id = pending[i].task_id
+            print(f"Evaluated: {task_id} (score: {result.score:.2f})")
+            entry = {
+                "task_id": task_id,
+                "score": result.score,
+                "details": result.details
+            }
+            results_by_id[task_id] = entry
+            
+            # Failed evaluations are not persisted so they are retried on resume
+            if partial_file and "error" not in result.details:
+                partial_file.write(json.dumps(entry) + "\n")
+                partial_file.flush()
+        
+        try:
+            evaluate_git_qa_batch(runs, num_threads=args.num_threads, on_result=record_result)
+        finally:
+            if partial_file:
+                partial_file.close()
+        
+        results = [results_by_id[task_data.task_id] for task_data in tasks]
+        
+        # Calculate average score over the evaluations that succeeded
+        valid_scores = [r["score"] for r in results if "error" not in r["details"]]
         avg_score = sum(valid_scores) / len(valid_scores) if valid_scores else 0.0
         
         print(f"\nEvaluation complete!")
@@ -227,6 +532,7 @@ def main():
                     },
                     "results": results
                 }, f, indent=2)
+            partial_path.unlink()
 
 
 if __name__ == "__main__":
@@ -15,7 +15,7 @@ This script:
 
 Required env vars:
 - GOOGLE_API_KEY: For Gemini 2.5 Flash API
-- GITHUB_TOKEN (optional): For increased API rate limits
+- GITHUB_TOKEN (optional): For increased API rate limits and single-request-per-page GraphQL fetching
 
 Usage: 
 python utils/generate_tasks/github_tasks.py <REPO_URL> [--num-tasks N] [--skip-comments]
@@ -34,11 +34,20 @@ import json
 import subprocess
 import requests
 import argparse
+import math
+import re
+import threading
+from collections import Counter
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from urllib.parse import urlparse
+from xml.sax.saxutils import escape
 import time
 
+from requests.adapters import HTTPAdapter
+
 # Add parent directory to path for imports
 sys.path.append(str(Path(__file__).parent))
 
@@ -53,10 +62,34 @@ lm = dspy.LM(
     "gemini/gemini-2.5-flash", 
     api_key=os.getenv("GOOGLE_API_KEY"), 
     temperature=0.7,
-    max_tokens=1000000  # 1M tokens for large context
+    max_tokens=32000  # Output cap; the 1M-token context window applies to input only
 )
 dspy.configure(lm=lm)
 
+# Shared session so GitHub API calls reuse pooled keep-alive connections
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+# Number of concurrent comment fetches per page of issues/PRs
+COMMENT_FETCH_WORKERS = 16
+
+# Earliest time the next throttled GitHub API request may be sent, shared by every fetch thread
+rate_limit_lock = threading.Lock()
+next_request_time = 0.0
+
+# Number of most recent PRs and issues included in each generation prompt
+PROMPT_ITEM_LIMIT = 30
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+# GraphQL connection and per-item fields for each REST data type
+GRAPHQL_CONNECTIONS = {
+    "pulls": ("pullRequests", "number title body state merged createdAt updatedAt author { login }"),
+    "issues": ("issues", "number title body state createdAt updatedAt author { login } labels(first: 20) { nodes { name } }"),
+}
+GRAPHQL_COMMENT_FIELDS = "comments(first: 20) { nodes { author { login } body createdAt } }"
+GRAPHQL_REVIEW_COMMENT_FIELDS = "reviews(first: 20) { nodes { " + GRAPHQL_COMMENT_FIELDS + " } }"
+
 
 def parse_github_url(url: str) -> tuple[str, str]:
     """Parse GitHub URL to extract owner and repo name."""
@@ -95,8 +128,33 @@ def clone_repository(repo_url: str, target_dir: Path) -> None:
     print("Repository cloned successfully")
 
 
-def fetch_comments(owner: str, repo: str, item_type: str, item_number: int, headers: Dict[str, str]) -> List[Dict[str, Any]]:
-    """Fetch comments for a specific issue or PR."""
+def respect_rate_limit(response: requests.Response) -> None:
+    """Spread the remaining GitHub API budget over the time left until it resets.
+    
+    The budget is shared by every thread, so each caller reserves the next free slot on one
+    schedule and sleeps until it, rather than each thread pacing itself independently.
+    """
+    global next_request_time
+    if 'X-RateLimit-Remaining' not in response.headers or 'X-RateLimit-Reset' not in response.headers:
+        return
+    
+    remaining = int(response.headers['X-RateLimit-Remaining'])
+    if remaining >= 100:
+        return
+    
+    interval = (int(response.headers['X-RateLimit-Reset']) - time.time()) / max(remaining, 1)
+    if interval <= 0:
+        return
+    
+    with rate_limit_lock:
+        now = time.time()
+        slot = max(next_request_time, now)
+        next_request_time = slot + interval
+    time.sleep(slot - now)
+
+
+def fetch_comments(owner: str, repo: str, item_type: str, item_number: int, headers: Dict[str, str]) -> Optional[List[Dict[str, Any]]]:
+    """Fetch comments for a specific issue or PR, or return None if a request fails."""
     if item_type == "pulls":
         # For PRs, we need both issue comments and review comments
         issue_comments_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{item_number}/comments"
@@ -105,38 +163,240 @@ def fetch_comments(owner: str, repo: str, item_type: str, item_number: int, head
         all_comments = []
         
         # Fetch issue-style comments
-        response = requests.get(issue_comments_url, headers=headers)
-        if response.status_code == 200:
-            all_comments.extend(response.json())
+        response = session.get(issue_comments_url, headers=headers)
+        respect_rate_limit(response)
+        if response.status_code != 200:
+            return None
+        all_comments.extend(response.json())
         
         # Fetch review comments
-        response = requests.get(review_comments_url, headers=headers)
-        if response.status_code == 200:
-            all_comments.extend(response.json())
+        response = session.get(review_comments_url, headers=headers)
+        respect_rate_limit(response)
+        if response.status_code != 200:
+            return None
+        all_comments.extend(response.json())
             
         return all_comments
     else:
         # For issues, just fetch issue comments
         comments_url = f"https://api.github.com/repos/{owner}/{repo}/issues/{item_number}/comments"
-        response = requests.get(comments_url, headers=headers)
-        if response.status_code == 200:
-            return response.json()
+        response = session.get(comments_url, headers=headers)
+        respect_rate_limit(response)
+        if response.status_code != 200:
+            return None
+        return response.json()
+
+
+def build_graphql_query(data_type: str, fetch_comments_flag: bool) -> str:
+    """Build the paginated GraphQL query listing PRs or issues, with comments inlined."""
+    connection, fields = GRAPHQL_CONNECTIONS[data_type]
+    if fetch_comments_flag:
+        fields += " " + GRAPHQL_COMMENT_FIELDS
+        if data_type == "pulls":
+            fields += " " + GRAPHQL_REVIEW_COMMENT_FIELDS
+    
+    return (
+        "query($owner: String!, $name: String!, $cursor: String) {"
+        " repository(owner: $owner, name: $name) {"
+        f" items: {connection}(first: 100, after: $cursor, orderBy: {{field: CREATED_AT, direction: DESC}}) {{"
+        f" nodes {{ {fields} }}"
+        " pageInfo { hasNextPage endCursor }"
+        " } } }"
+    )
+
+
+def graphql_comment_to_rest(comment: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a GraphQL comment node onto the REST comment shape."""
+    return {
+        "user": comment.get("author") or {},
+        "created_at": comment.get("createdAt"),
+        "body": comment.get("body")
+    }
+
+
+def graphql_node_to_rest(node: Dict[str, Any], data_type: str) -> Dict[str, Any]:
+    """Map a GraphQL PR/issue node onto the REST item shape the formatters expect."""
+    item = {
+        "number": node.get("number"),
+        "title": node.get("title"),
+        # REST only distinguishes open/closed; merged PRs are reported as closed
+        "state": "open" if node.get("state") == "OPEN" else "closed",
+        "user": node.get("author") or {},
+        "created_at": node.get("createdAt"),
+        "updated_at": node.get("updatedAt"),
+        "body": node.get("body")
+    }
+    
+    if data_type == "pulls":
+        item["merged"] = node.get("merged", False)
+    else:
+        item["labels"] = [{"name": label["name"]} for label in node.get("labels", {}).get("nodes", [])]
+    
+    if "comments" in node:
+        comments = node["comments"]["nodes"]
+        for review in node.get("reviews", {}).get("nodes", []):
+            comments.extend(review["comments"]["nodes"])
+        item["comments"] = [graphql_comment_to_rest(comment) for comment in comments]
+    
+    return item
+
+
+def load_partial_items(partial_path: Path) -> List[Dict[str, Any]]:
+    """Load items already streamed to a JSON Lines file by an interrupted fetch."""
+    if not partial_path.exists():
         return []
+    
+    with open(partial_path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_items(partial_path: Path, items: List[Dict[str, Any]]) -> None:
+    """Append items to a JSON Lines file, one object per line."""
+    with open(partial_path, 'a', encoding='utf-8') as f:
+        for item in items:
+            f.write(json.dumps(item, separators=(',', ':'), ensure_ascii=False) + "\n")
+
+
+def stream_json_array(path: Path, chunk_size: int = 1 << 16):
+    """Yield the elements of a top-level JSON array one at a time, reading the file in chunks.
+    
+    Only the elements consumed so far are parsed, so taking the first few items of a large
+    PR/issue dump does not load the whole file into memory.
+    
+    Meant for arrays whose elements are objects or arrays, like the PR/issue dumps: their closing
+    bracket marks where they end. A scalar element such as a number may continue into the next
+    chunk, so an element is only yielded once the "," or "]" after it (or end of file) has been
+    read. A truncated file raises json.JSONDecodeError.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer = ""
+        while not buffer:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            buffer = chunk.lstrip()
+        if not buffer.startswith('['):
+            raise ValueError(f"{path} does not contain a JSON array")
+        buffer = buffer[1:]
+        eof = False
+        
+        while True:
+            buffer = buffer.lstrip()
+            if buffer.startswith(','):
+                buffer = buffer[1:]
+                continue
+            if buffer.startswith(']'):
+                return
+            
+            try:
+                item, end = decoder.raw_decode(buffer)
+                # Every element is followed by "," or "]"; otherwise a scalar may be cut off, e.g. "12" of "123"
+                rest = buffer[end:].lstrip()
+                complete = eof or rest[:1] in (',', ']')
+            except json.JSONDecodeError:
+                # The next element continues past the end of the buffer
+                if eof:
+                    raise
+                complete = False
+            
+            if not complete:
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer += chunk
+                continue
+            
+            yield item
+            buffer = rest
+
+
+def fetch_github_data_graphql(owner: str, repo: str, data_type: str, partial_path: Path, seen: set, fetch_comments_flag: bool, headers: Dict[str, str]) -> Optional[bool]:
+    """Fetch PRs or issues with their comments through the GraphQL API, one request per page.
+    
+    New items are appended to `partial_path` and added to `seen`, and the cursor of the last
+    saved page is kept next to it so an interrupted fetch resumes from the following page.
+    
+    Returns True once the last page has been fetched, False if it stopped early because the
+    rate limit ran low, and None if a request failed so the caller can fall back to the REST API.
+    """
+    query = build_graphql_query(data_type, fetch_comments_flag)
+    cursor_path = partial_path.with_suffix(".cursor")
+    cursor = cursor_path.read_text().strip() if cursor_path.exists() else ""
+    variables = {"owner": owner, "name": repo, "cursor": cursor or None}
+    
+    page = 1
+    
+    while True:
+        response = session.post(GRAPHQL_URL, json={"query": query, "variables": variables}, headers=headers)
+        
+        if response.status_code != 200:
+            print(f"Error fetching {data_type} via GraphQL: {response.status_code} - {response.text}")
+            return None
+        
+        payload = response.json()
+        if payload.get("errors") or not payload.get("data"):
+            print(f"Error fetching {data_type} via GraphQL: {payload.get('errors')}")
+            return None
+        
+        connection = payload["data"]["repository"]["items"]
+        items = [
+            graphql_node_to_rest(node, data_type)
+            for node in connection["nodes"]
+            if node.get("number") not in seen
+        ]
+        
+        # Save incrementally, then record that this page is done
+        append_items(partial_path, items)
+        seen.update(item["number"] for item in items)
+        cursor_path.write_text(connection["pageInfo"]["endCursor"] or "")
+        
+        print(f"Fetched page {page} ({len(items)} new items, total: {len(seen)})")
+        
+        if not connection["pageInfo"]["hasNextPage"]:
+            return True
+        
+        # Check if we've hit rate limit
+        if 'X-RateLimit-Remaining' in response.headers:
+            remaining = int(response.headers['X-RateLimit-Remaining'])
+            if remaining < 10:
+                print(f"Rate limit low ({remaining} remaining), stopping...")
+                return False
+        respect_rate_limit(response)
+        
+        variables["cursor"] = connection["pageInfo"]["endCursor"]
+        page += 1
 
 
-def fetch_github_data(owner: str, repo: str, data_type: str, save_path: Path, fetch_comments_flag: bool = True) -> List[Dict[str, Any]]:
-    """Fetch PRs or issues from GitHub API with comments and save incrementally."""
+def fetch_github_data(owner: str, repo: str, data_type: str, save_path: Path, fetch_comments_flag: bool = True, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Fetch PRs or issues from GitHub API with comments and save incrementally.
+    
+    Uses the GraphQL API when a token is available, since it returns comments inline with each
+    page instead of needing one extra REST call per item, and falls back to the REST API.
+    
+    Items are streamed to a JSON Lines file next to `save_path` as they arrive, so an interrupted
+    fetch resumes without re-fetching them. Only once the last page has been fetched are they
+    written to `save_path`; if a request fails or the rate limit runs low, the JSON Lines file is
+    kept for the next run and the items fetched so far are returned.
+    
+    Returns at most `limit` items (all of them if None). When `save_path` already exists it is
+    streamed, so only the returned items are parsed.
+    """
     print(f"Fetching {data_type} for {owner}/{repo}...")
     
     # Check if we already have data
     if save_path.exists():
-        with open(save_path, 'r') as f:
-            existing_data = json.load(f)
-        print(f"Found existing {data_type} data with {len(existing_data)} items")
+        existing_data = list(islice(stream_json_array(save_path), limit))
+        print(f"Found existing {data_type} data, loaded {len(existing_data)} items")
         return existing_data
     
     save_path.parent.mkdir(parents=True, exist_ok=True)
     
+    # Resume from a previous interrupted fetch
+    partial_path = save_path.with_suffix(".jsonl")
+    seen = {item.get('number') for item in load_partial_items(partial_path)}
+    if seen:
+        print(f"Resuming with {len(seen)} {data_type} already fetched")
+    
     # GitHub API endpoint
     endpoint = f"https://api.github.com/repos/{owner}/{repo}/{data_type}"
     
@@ -151,80 +411,162 @@ def fetch_github_data(owner: str, repo: str, data_type: str, save_path: Path, fe
     # Add GitHub token if available
     headers = {}
     github_token = os.getenv("GITHUB_TOKEN")
+    complete = None
     if github_token:
         headers["Authorization"] = f"token {github_token}"
+        
+        # The GraphQL API requires authentication
+        complete = fetch_github_data_graphql(owner, repo, data_type, partial_path, seen, fetch_comments_flag, headers)
+        if complete is None:
+            print("Falling back to the REST API...")
     
-    all_items = []
     page = 1
     
-    while True:
+    while complete is None:
         params["page"] = page
-        response = requests.get(endpoint, params=params, headers=headers)
+        response = session.get(endpoint, params=params, headers=headers)
         
         if response.status_code != 200:
             print(f"Error fetching {data_type}: {response.status_code} - {response.text}")
+            complete = False
             break
         
         items = response.json()
         if not items:
+            complete = True
             break
         
-        # Fetch comments for each item if requested
-        if fetch_comments_flag:
+        # PRs also appear under /issues; they are fetched separately, so drop them before
+        # spending comment requests on them
+        if data_type == "issues":
+            items = [item for item in items if 'pull_request' not in item]
+        
+        # Skip items fetched before an interruption
+        items = [item for item in items if item.get('number') not in seen]
+        
+        # Fetch comments for each item if requested; fetches are independent so run them concurrently
+        if fetch_comments_flag and items:
             print(f"  Fetching comments for {len(items)} items...")
-            for item in items:
-                item_number = item.get('number')
-                if item_number:
-                    comments = fetch_comments(owner, repo, data_type, item_number, headers)
+            numbered_items = [item for item in items if item.get('number')]
+            with ThreadPoolExecutor(max_workers=COMMENT_FETCH_WORKERS) as executor:
+                all_comments = executor.map(
+                    lambda item: fetch_comments(owner, repo, data_type, item['number'], headers),
+                    numbered_items
+                )
+                for item, comments in zip(numbered_items, all_comments):
                     item['comments'] = comments
-                    time.sleep(0.1)  # Small delay to be respectful
         
-        all_items.extend(items)
+        # Items whose comments could not be fetched are left unsaved so the next run retries them
+        failed_items = [item for item in items if item.get('comments', []) is None]
+        items = [item for item in items if item.get('comments', []) is not None]
         
         # Save incrementally
-        with open(save_path, 'w') as f:
-            json.dump(all_items, f, indent=2)
+        append_items(partial_path, items)
+        seen.update(item.get('number') for item in items)
+        
+        print(f"Fetched page {page} ({len(items)} new items, total: {len(seen)})")
         
-        print(f"Fetched page {page} ({len(items)} items, total: {len(all_items)})")
+        if failed_items:
+            print(f"Could not fetch comments for {len(failed_items)} {data_type}, stopping...")
+            complete = False
+            break
         
         # Check if we've hit rate limit
         if 'X-RateLimit-Remaining' in response.headers:
             remaining = int(response.headers['X-RateLimit-Remaining'])
             if remaining < 10:
                 print(f"Rate limit low ({remaining} remaining), stopping...")
+                complete = False
                 break
+        respect_rate_limit(response)
         
         page += 1
         
         # Small delay to be respectful
         time.sleep(0.5)
     
+    all_items = load_partial_items(partial_path)
+    if not complete:
+        print(f"Fetch of {data_type} incomplete: {len(all_items)} items kept in {partial_path}, re-run to resume")
+        return all_items[:limit]
+    
+    # Write the aggregate JSON file the rest of the pipeline reads; it is machine-read only,
+    # so it is written compactly rather than pretty-printed
+    with open(save_path, 'w', encoding='utf-8') as f:
+        json.dump(all_items, f, separators=(',', ':'), ensure_ascii=False)
+    partial_path.unlink(missing_ok=True)
+    partial_path.with_suffix(".cursor").unlink(missing_ok=True)
+    
     print(f"Total {data_type} fetched: {len(all_items)}")
-    return all_items
+    return all_items[:limit]
+
+
+def xml_text(value: Any, default: str = "unknown") -> str:
+    """Escape a possibly missing value for use as XML text."""
+    return escape(str(default if value is None else value))
+
+
+COMMENT_XML_TEMPLATE = """    <comment>
+      <author>{author}</author>
+      <created_at>{created_at}</created_at>
+      <body>{body}</body>
+    </comment>"""
+
+PR_XML_TEMPLATE = """<pull_request number="{number}">
+  <title>{title}</title>
+  <state>{state}</state>
+  <author>{author}</author>
+  <created_at>{created_at}</created_at>
+  <updated_at>{updated_at}</updated_at>
+  <merged>{merged}</merged>
+  <body>{body}</body>{comments}
+</pull_request>"""
+
+ISSUE_XML_TEMPLATE = """<issue number="{number}">
+  <title>{title}</title>
+  <state>{state}</state>
+  <author>{author}</author>
+  <created_at>{created_at}</created_at>
+  <updated_at>{updated_at}</updated_at>
+  <labels>{labels}</labels>
+  <body>{body}</body>{comments}
+</issue>"""
+
+
+def format_comments_as_xml(comments: List[Dict[str, Any]]) -> str:
+    """Format up to 10 comments as an XML <comments> block, or "" if there are none."""
+    comment_chunks = [
+        COMMENT_XML_TEMPLATE.format(
+            author=xml_text((comment.get('user') or {}).get('login')),
+            created_at=xml_text(comment.get('created_at')),
+            body=xml_text((comment.get('body') or 'No content')[:500])
+        )
+        for comment in (comments or [])[:10]
+    ]
+    if not comment_chunks:
+        return ""
+    return "\n  <comments>\n" + "\n".join(comment_chunks) + "\n  </comments>"
+
+
+def sanitize_item(item: Dict[str, Any]) -> Dict[str, str]:
+    """Flatten a PR or issue into XML-escaped field values, filling in defaults for missing fields."""
+    return {
+        "number": xml_text(item.get('number'), 'N/A'),
+        "title": xml_text(item.get('title'), 'No title'),
+        "state": xml_text(item.get('state')),
+        "author": xml_text((item.get('user') or {}).get('login')),
+        "created_at": xml_text(item.get('created_at')),
+        "updated_at": xml_text(item.get('updated_at')),
+        "merged": xml_text(item.get('merged', False)),
+        "labels": xml_text(', '.join([label['name'] for label in item.get('labels', [])])),
+        "body": xml_text(item.get('body'), 'No description'),
+        "comments": format_comments_as_xml(item.get('comments')),
+    }
 
 
 def format_pr_as_xml(pr: Dict[str, Any]) -> str:
     """Format a PR as XML for better structure."""
-    comments_xml = ""
-    if 'comments' in pr and pr['comments']:
-        comments_xml = "\n  <comments>\n"
-        for comment in pr['comments'][:10]:  # Limit to 10 comments
-            comments_xml += f"""    <comment>
-      <author>{comment.get('user', {}).get('login', 'unknown')}</author>
-      <created_at>{comment.get('created_at', 'unknown')}</created_at>
-      <body>{comment.get('body', 'No content')[:500]}</body>
-    </comment>\n"""
-        comments_xml += "  </comments>"
-    
-    return f"""<pull_request number="{pr.get('number', 'N/A')}">
-  <title>{pr.get('title', 'No title')}</title>
-  <state>{pr.get('state', 'unknown')}</state>
-  <author>{pr.get('user', {}).get('login', 'unknown')}</author>
-  <created_at>{pr.get('created_at', 'unknown')}</created_at>
-  <updated_at>{pr.get('updated_at', 'unknown')}</updated_at>
-  <merged>{pr.get('merged', False)}</merged>
-  <body>{pr.get('body', 'No description')}</body>{comments_xml}
-</pull_request>"""
+    return PR_XML_TEMPLATE.format_map(sanitize_item(pr))
 
 
 def format_issue_as_xml(issue: Dict[str, Any]) -> str:
@@ -233,26 +575,7 @@ def format_issue_as_xml(issue: Dict[str, Any]) -> str:
     if 'pull_request' in issue:
         return ""
     
-    comments_xml = ""
-    if 'comments' in issue and issue['comments']:
-        comments_xml = "\n  <comments>\n"
-        for comment in issue['comments'][:10]:  # Limit to 10 comments
-            comments_xml += f"""    <comment>
-      <author>{comment.get('user', {}).get('login', 'unknown')}</author>
-      <created_at>{comment.get('created_at', 'unknown')}</created_at>
-      <body>{comment.get('body', 'No content')[:500]}</body>
-    </comment>\n"""
-        comments_xml += "  </comments>"
-    
-    return f"""<issue number="{issue.get('number', 'N/A')}">
-  <title>{issue.get('title', 'No title')}</title>
-  <state>{issue.get('state', 'unknown')}</state>
-  <author>{issue.get('user', {}).get('login', 'unknown')}</author>
-  <created_at>{issue.get('created_at', 'unknown')}</created_at>
-  <updated_at>{issue.get('updated_at', 'unknown')}</updated_at>
-  <labels>{', '.join([label['name'] for label in issue.get('labels', [])])}</labels>
-  <body>{issue.get('body', 'No description')}</body>{comments_xml}
-</issue>"""
+    return ISSUE_XML_TEMPLATE.format_map(sanitize_item(issue))
 
 
 # DSPy Signatures for task generation
@@ -291,13 +614,37 @@ class GenerateGitHubQATasks(dspy.Signature):
     reasoning: str = dspy.OutputField(desc="Brief explanation of the generated tasks and their diversity")
 
 
-class DeduplicateTasks(dspy.Signature):
-    """Remove duplicate or highly similar tasks from a list."""
+# Tasks at least this TF-IDF cosine-similar to an already kept task are treated as duplicates
+DUPLICATE_SIMILARITY = 0.6
+
+
+def tfidf_vectors(texts: List[str]) -> List[Dict[str, float]]:
+    """Compute L2-normalized TF-IDF vectors for a small set of texts."""
+    token_counts = [Counter(re.findall(r"[a-z0-9]+", text.lower())) for text in texts]
+    document_frequency = Counter(token for counts in token_counts for token in counts)
     
-    tasks: List[GitHubQATask] = dspy.InputField(desc="List of tasks to deduplicate")
+    vectors = []
+    for counts in token_counts:
+        # Smoothed IDF: rarer terms weigh more, but terms shared by every text keep a weight of 1.
+        # Unsmoothed, they would get 0, leaving identical texts with empty vectors and no similarity.
+        vector = {
+            token: count * (math.log((1 + len(texts)) / (1 + document_frequency[token])) + 1)
+            for token, count in counts.items()
+        }
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({token: weight / norm for token, weight in vector.items()} if norm else {})
+    return vectors
+
+
+def deduplicate_tasks(tasks: List[GitHubQATask], threshold: float = DUPLICATE_SIMILARITY) -> List[GitHubQATask]:
+    """Remove tasks whose question is near-identical to an earlier task's, keeping the first."""
+    vectors = tfidf_vectors([task.task for task in tasks])
     
-    unique_tasks: List[GitHubQATask] = dspy.OutputField(desc="List of unique tasks after removing duplicates")
-    removed_count: int = dspy.OutputField(desc="Number of duplicate tasks removed")
+    kept = []
+    for i, vector in enumerate(vectors):
+        if all(sum(weight * vectors[j].get(token, 0.0) for token, weight in vector.items()) < threshold for j in kept):
+            kept.append(i)
+    return [tasks[i] for i in kept]
 
 
 def generate_tasks_for_type(
@@ -310,11 +657,11 @@ def generate_tasks_for_type(
     num_tasks: int = 10
 ) -> List[Dict[str, Any]]:
     """Generate tasks for a specific task type."""
-    print(f"\n=== Generating {num_tasks} tasks for {task_type} ===")
+    print(f"=== Generating {num_tasks} tasks for {task_type} ===")
     
     # Format PRs and issues as XML
-    pr_xml = "\n".join([format_pr_as_xml(pr) for pr in prs[:30]])  # Limit to 30 most recent
-    issue_xml = "\n".join([xml for xml in [format_issue_as_xml(issue) for issue in issues[:30]] if xml])
+    pr_xml = "\n".join([format_pr_as_xml(pr) for pr in prs[:PROMPT_ITEM_LIMIT]])  # Limit to the most recent
+    issue_xml = "\n".join([xml for xml in [format_issue_as_xml(issue) for issue in issues[:PROMPT_ITEM_LIMIT]] if xml])
     
     # Format examples with updated context
     examples_text = """IMPORTANT: Success criteria should be attainable via referencing information available in a git repository:
@@ -339,10 +686,9 @@ Examples:
     
     # Generate all tasks at once
     generator = dspy.ChainOfThought(GenerateGitHubQATasks)
-    deduplicator = dspy.ChainOfThought(DeduplicateTasks)
     
     try:
-        print(f"  Generating batch of {num_tasks} tasks...")
+        print(f"  [{task_type}] Generating batch of {num_tasks} tasks...")
         result = generator(
             task_type=task_type,
             task_type_description=task_description,
@@ -353,16 +699,16 @@ Examples:
             num_tasks=num_tasks
         )
         
-        print(f"  Generated {len(result.tasks)} tasks, deduplicating...")
+        print(f"  [{task_type}] Generated {len(result.tasks)} tasks, deduplicating...")
         
-        # Deduplicate
-        dedup_result = deduplicator(tasks=result.tasks)
+        # Deduplicate locally by text similarity; no LLM call needed
+        unique_tasks = deduplicate_tasks(result.tasks)
         
-        print(f"  Removed {dedup_result.removed_count} duplicates, {len(dedup_result.unique_tasks)} unique tasks remain")
+        print(f"  [{task_type}] Removed {len(result.tasks) - len(unique_tasks)} duplicates, {len(unique_tasks)} unique tasks remain")
         
         # Convert to output format
         generated_tasks = []
-        for task in dedup_result.unique_tasks:
+        for task in unique_tasks:
             generated_tasks.append({
                 "task_id": task.task_id,
                 "task": task.task,
@@ -373,7 +719,7 @@ Examples:
         return generated_tasks
         
     except Exception as e:
-        print(f"  ✗ Error generating tasks: {str(e)}")
+        print(f"  [{task_type}] ✗ Error generating tasks: {str(e)}")
         return []
 
 
@@ -403,7 +749,7 @@ def main():
         print("✅ GitHub authentication configured")
         # Quick rate limit check
         headers = {"Authorization": f"token {github_token}"}
-        rate_response = requests.get("https://api.github.com/rate_limit", headers=headers)
+        rate_response = session.get("https://api.github.com/rate_limit", headers=headers)
         if rate_response.status_code == 200:
             remaining = rate_response.json()['rate']['remaining']
             limit = rate_response.json()['rate']['limit']
@@ -427,11 +773,11 @@ def main():
     # Step 1: Clone repository
     clone_repository(args.repo_url, env_dir)
     
-    # Step 2: Fetch PRs with comments
-    prs = fetch_github_data(owner, repo_name, "pulls", pr_path, fetch_comments_flag=not args.skip_comments)
+    # Step 2: Fetch PRs with comments, keeping only the ones used in prompts
+    prs = fetch_github_data(owner, repo_name, "pulls", pr_path, fetch_comments_flag=not args.skip_comments, limit=PROMPT_ITEM_LIMIT)
     
     # Step 3: Fetch Issues with comments
-    issues = fetch_github_data(owner, repo_name, "issues", issue_path, fetch_comments_flag=not args.skip_comments)
+    issues = fetch_github_data(owner, repo_name, "issues", issue_path, fetch_comments_flag=not args.skip_comments, limit=PROMPT_ITEM_LIMIT)
     
     # Step 4: Load examples
     examples_path = Path("tasks/github_qa/dspy.json")
@@ -447,24 +793,29 @@ def main():
         "performance_evolution": "Tests understanding of optimization attempts and outcomes. Agents must track what approaches were tried, what worked, what failed, and why."
     }
     
-    # Step 5: Generate tasks for each type
-    all_tasks = []
-    
-    for task_type, description in task_types.items():
-        # Filter examples for this task type
-        type_examples = [ex for ex in examples if task_type in ex['task_id']]
-        
-        tasks = generate_tasks_for_type(
-            task_type=task_type,
-            task_description=description,
-            prs=prs,
-            issues=issues,
-            examples=type_examples if type_examples else examples,  # Use all examples if no specific ones
-            repo_name=repo_name,
-            num_tasks=args.num_tasks
-        )
+    # Step 5: Generate tasks for each type; the categories are independent long-latency LLM
+    # calls, so run them concurrently
+    with ThreadPoolExecutor(max_workers=len(task_types)) as executor:
+        futures = []
+        for task_type, description in task_types.items():
+            # Filter examples for this task type
+            type_examples = [ex for ex in examples if task_type in ex['task_id']]
+            
+            futures.append(executor.submit(
+                generate_tasks_for_type,
+                task_type=task_type,
+                task_description=description,
+                prs=prs,
+                issues=issues,
+                examples=type_examples if type_examples else examples,  # Use all examples if no specific ones
+                repo_name=repo_name,
+                num_tasks=args.num_tasks
+            ))
         
-        all_tasks.extend(tasks)
+        # Collect in category order so the output file is deterministic
+        all_tasks = []
+        for future in futures:
+            all_tasks.extend(future.result())
     
     # Step 6: Save all tasks
     print(f"\nSaving {len(all_tasks)} tasks to {output_path}")
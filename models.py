@@ -1,56 +1,90 @@
-from pydantic import BaseModel, Field
-from typing import Optional, Callable
-from functools import wraps
-import inspect
-
-class Task(BaseModel):
-  task_id: str = Field(..., example="update_readme")
-  task: str = Field(..., example="Update the README.md to describe the repository. Create the README.md if it doesn't exist")
-  success_criteria: Optional[str] = Field(None, example="README.md exists and contains at least 100 words describing the repository's purpose, structure, and usage")
-  ms: Optional[int] = Field(None, example=3600000)
-  dir_name: Optional[str] = Field(None, description="Directory name of the env folder to clone and the eval folder to evaluate with", example="dummy_env")
-
-class AgentResult(BaseModel):
-    completed: bool = Field(..., description="Whether the experiment was completed")
-    result: str = Field(..., description="The result of the experiment")
-    input_tokens: Optional[int] = Field(None, description="The number of input tokens used by the agent")
-    output_tokens: Optional[int] = Field(None, description="The number of output tokens used by the agent")
-    cost: Optional[float] = Field(None, description="The cost of the agent")
-    reasoning: str = Field(..., description="The reasoning of the agent")
-
-class EvalResult(BaseModel):
-  score: float = Field(..., description="Numerical score from 0.0 to 1.0")
-  details: dict = Field(..., description="Detailed breakdown of the evaluation")
-
-class Run(BaseModel):
-  task_id: str = Field(..., description="Unique identifier for the task")
-  task: str = Field(..., description="The task description/question")
-  env_path: str = Field(..., description="Path to the environment where the agent runs")
-  agent_answer_path: Optional[str] = Field(None, description="Path to the agent's answer file")
-  source_answer_path: Optional[str] = Field(None, description="Path to the source answer file")
-
-# Type alias for evaluation functions
-EvalFunction = Callable[[Run], EvalResult]
+"""
+Plain data containers shared by the benchmark's agents and evaluators.
+
+They are built from trusted, in-repo data, so they are immutable dataclasses and NamedTuples
+without validation.
+Example Task:
+  Task(
+    task_id="update_readme",
+    task="Update the README.md to describe the repository. Create the README.md if it doesn't exist",
+    success_criteria="README.md exists and contains at least 100 words describing the repository's purpose, structure, and usage",
+    ms=3600000,
+    dir_name="dummy_env",
+  )
+"""
+import sys
+from dataclasses import dataclass, fields
+from typing import Optional, Callable, NamedTuple, Protocol, runtime_checkable
+
+@dataclass(slots=True, kw_only=True, frozen=True)
+class Task:
+  task_id: str
+  task: str
+  success_criteria: Optional[str] = None
+  ms: Optional[int] = None
+  dir_name: Optional[str] = None  # Directory name of the env folder to clone and the eval folder to evaluate with
+
+  def __post_init__(self):
+    # task_id is used as a dict key and compared throughout; interned strings compare by identity first
+    object.__setattr__(self, "task_id", sys.intern(self.task_id))
+
+  @classmethod
+  def from_dict(cls, data: dict) -> "Task":
+    """Build a Task from a trusted task definition dict, ignoring keys that are not Task fields.
+    
+    No validation or conversion is done; the values are assigned as-is.
+    """
+    return cls(**{name: data[name] for name in TASK_FIELDS if name in data})
+
+# Computed once rather than calling dataclasses.fields() on every Task.from_dict
+TASK_FIELDS = tuple(f.name for f in fields(Task))
+
+# Results are built in bulk by evaluation runs, so they are NamedTuples: plain tuple construction,
+# and `._asdict()` for serialization
+class AgentResult(NamedTuple):
+    completed: bool  # Whether the experiment was completed
+    result: str  # The result of the experiment
+    reasoning: str  # The reasoning of the agent
+    input_tokens: Optional[int] = None  # The number of input tokens used by the agent
+    output_tokens: Optional[int] = None  # The number of output tokens used by the agent
+    cost: Optional[float] = None  # The cost of the agent
+
+class EvalResult(NamedTuple):
+  score: float  # Numerical score from 0.0 to 1.0
+  details: dict  # Detailed breakdown of the evaluation
+
+@dataclass(slots=True, kw_only=True, frozen=True)
+class Run:
+  task_id: str  # Unique identifier for the task
+  task: str  # The task description/question
+  env_path: str  # Path to the environment where the agent runs
+  agent_answer_path: Optional[str] = None  # Path to the agent's answer file
+  agent_answer: Optional[str] = None  # The agent's answer text, if already read; takes precedence over agent_answer_path
+  source_answer_path: Optional[str] = None  # Path to the source answer file
+
+  def __post_init__(self):
+    object.__setattr__(self, "task_id", sys.intern(self.task_id))
+
+@runtime_checkable
+class EvalFunction(Protocol):
+  """Type of evaluation functions: take a Run and return its EvalResult."""
+  def __call__(self, r: Run) -> EvalResult: ...
 
 def eval_function(func: EvalFunction) -> EvalFunction:
-  """Decorator to mark a function as an evaluation function."""
-  @wraps(func)
-  def wrapper(r: Run) -> EvalResult:
-    return func(r)
-  return wrapper
+  """Decorator to mark a function as an evaluation function.
+  
+  Sets `func.__eval_function__ = True` so evaluation functions can be discovered by attribute,
+  and returns `func` itself, so calls pay no wrapper overhead.
+  """
+  func.__eval_function__ = True
+  return func
 
 # Type alias for agent main functions
 AgentMainFunction = Callable[[Run], AgentResult]
 
 def agent_main(func):
-  """Decorator to mark a function as an agent main function. Handles both sync and async functions."""
-  if inspect.iscoroutinefunction(func):
-    @wraps(func)
-    async def async_wrapper(r: Run) -> AgentResult:
-      return await func(r)
-    return async_wrapper
-  else:
-    @wraps(func)
-    def sync_wrapper(r: Run) -> AgentResult:
-      return func(r)
-    return sync_wrapper
\ No newline at end of file
+  """Decorator to mark a function as an agent main function. Handles both sync and async functions.
+  
+  Returns `func` itself: a coroutine function stays awaitable and a sync one stays sync, so no wrapper is needed.
+  """
+  return func
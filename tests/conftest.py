@@ -0,0 +1,24 @@
+"""Shared pytest configuration. The repository root is put on sys.path by `pythonpath` in pyproject.toml."""
+
+import pytest
+
+import ai
+import eval
+from ai import dspy
+
+
+@pytest.fixture(autouse=True, scope="session")
+def disable_evaluation_caches():
+    """Evaluate for real in tests: cached scores would hide changes in the grader's behavior."""
+    cache_dir = eval.CACHE_DIR
+    eval.CACHE_DIR = None
+    if hasattr(dspy, "configure_cache"):
+        dspy.configure_cache(enable_disk_cache=False, enable_memory_cache=False)
+    yield
+    eval.CACHE_DIR = cache_dir
+
+
+@pytest.fixture(autouse=True, scope="session")
+def evaluator_lm():
+    """Grade with the evaluator model: importing generate.py reconfigures DSPy's default LM to its generator model."""
+    dspy.configure(lm=ai.lm)
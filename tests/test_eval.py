@@ -1,113 +1,311 @@
 #!/usr/bin/env python3
 """
-Test script for the git-qa-benchmark evaluation system.
+Tests for the git-qa-benchmark evaluation system.
 
-This script tests the evaluation system with mock answers of varying quality
-to ensure the scoring works correctly.
+Mock answers of varying quality are evaluated to ensure the scoring works correctly.
+Each mock answer is a separate test that calls the evaluator LLM, so they can run in
+parallel with `pytest -n auto tests/` and are skipped when OPENAI_API_KEY is not set.
+
+Running this module from the repository root (`python -m tests.test_eval`) logs a
+per-criterion breakdown of every mock answer and saves it to tests/eval_test_results.json.
 """
 
 import sys
 import os
 import json
+import asyncio
+import logging
+from dataclasses import dataclass
 from pathlib import Path
 
-# Add parent directory to path to import eval module
-sys.path.append(str(Path(__file__).parent.parent))
+import pytest
+
+import eval
+from ai import dspy
+from eval import EvaluationResult, cache_key, evaluate_git_qa_batch, evaluate_task, evaluate_task_async, get_task, load_tasks, make_run
+
+logger = logging.getLogger(__name__)
+
+MOCK_TASK_ID = "pattern_recognition_teleprompter_crash"
+
+# Resolved against this file once, so the tests do not depend on the working directory
+TESTS_DIR = Path(__file__).parent
+MOCK_DIR = TESTS_DIR / "mock"
+SOURCE_ANSWERS_DIR = TESTS_DIR.parent / "dataset_from_dspy" / "source_answers"
+
+
+@dataclass(frozen=True, slots=True)
+class MockCase:
+    """A mock answer file and the score range it should get."""
+    file: Path
+    expected_min: float
+    expected_max: float
+    description: str
+
+
+# Mock answer files and expected score ranges
+MOCK_CASES = (
+    MockCase(
+        file=MOCK_DIR / "pattern_recognition_teleprompter_crash_excellent.txt",
+        expected_min=0.75,  # Should score 75%+
+        expected_max=1.0,
+        description="Excellent answer"
+    ),
+    MockCase(
+        file=MOCK_DIR / "pattern_recognition_teleprompter_crash_good.txt",
+        expected_min=0.60,  # Should score 60-79%
+        expected_max=0.79,
+        description="Good answer"
+    ),
+    MockCase(
+        file=MOCK_DIR / "pattern_recognition_teleprompter_crash_fair.txt",
+        expected_min=0.40,  # Should score 40-65%
+        expected_max=0.65,
+        description="Fair answer"
+    ),
+    MockCase(
+        file=MOCK_DIR / "pattern_recognition_teleprompter_crash_poor.txt",
+        expected_min=0.0,   # Should score 0-24%
+        expected_max=0.24,
+        description="Poor answer"
+    ),
+)
+
+# A fixed grade returned by the stub evaluator, so evaluation plumbing can be tested offline
+STUB_EVALUATION = EvaluationResult(
+    pattern_recognition=20, pattern_recognition_justification="Identifies the pattern.",
+    specific_evidence=20, specific_evidence_justification="Cites the PRs.",
+    root_cause_analysis=20, root_cause_analysis_justification="Explains the cause.",
+    actionable_insights=20, actionable_insights_justification="Suggests a fix.",
+    total_score=80, overall_assessment="A solid answer."
+)
+
+requires_api_key = pytest.mark.skipif(
+    not os.getenv("OPENAI_API_KEY"),
+    reason="OPENAI_API_KEY is not set, so mock answers cannot be evaluated"
+)
+
+
+@pytest.fixture(scope="session")
+def mock_task():
+    """The task the mock answers were written for, looked up once per session."""
+    task = get_task(MOCK_TASK_ID)
+    assert task is not None, f"Could not find task {MOCK_TASK_ID}"
+    return task
+
+
+@pytest.fixture
+def stub_evaluator(monkeypatch):
+    """Replace the evaluator LLM call with one returning STUB_EVALUATION, recording the task IDs it grades."""
+    graded = []
+    
+    def evaluate(task_id, source_answer, agent_answer):
+        graded.append(task_id)
+        return dspy.Prediction(evaluation_result=STUB_EVALUATION)
+    
+    monkeypatch.setattr(eval, "evaluator", evaluate)
+    return graded
+
+
+@requires_api_key
+@pytest.mark.parametrize("case", MOCK_CASES, ids=lambda case: case.description)
+def test_mock_answer(mock_task, case):
+    """Test that a mock answer scores within its expected range."""
+    try:
+        agent_answer = case.file.read_text()
+    except FileNotFoundError:
+        pytest.fail(f"Mock file not found: {case.file}")
+    
+    result = evaluate_task(mock_task, agent_answer=agent_answer)
+    
+    assert "error" not in result.details, result.details["error"]
+    assert case.expected_min <= result.score <= case.expected_max
 
-from eval import evaluate_task, load_tasks
 
+def test_basic_functionality():
+    """Test that tasks load and every task has a source answer."""
+    assert check_basic_functionality(), "Basic functionality check failed (see captured output)"
 
-def test_evaluation_with_mock_answers():
-    """Test the evaluation system with mock answers of different quality levels."""
+
+def test_unreadable_answers_do_not_abort_batch(tmp_path):
+    """Test that answers that cannot be read become zero-score results instead of aborting the batch."""
+    task = get_task(MOCK_TASK_ID)
+    env_dir = tmp_path / "env"
+    env_dir.mkdir()
+    (env_dir / "answer.txt").write_bytes(b"\xff\xfe not utf-8")
+    
+    runs = [
+        make_run(task, env_path=str(env_dir)),
+        make_run(task, agent_answer_path=str(tmp_path)),  # A directory, not a file
+    ]
+    results = evaluate_git_qa_batch(runs, num_threads=2)
     
-    # Load the tasks
+    assert [result.score for result in results] == [0.0, 0.0]
+    assert all("error" in result.details for result in results)
+    assert results[0].details["agent_answer_length"] == 0
+
+
+def test_cache_key_covers_evaluator_model():
+    """Test that switching the evaluator model does not reuse scores cached for another model."""
+    key = cache_key(MOCK_TASK_ID, "source", "agent")
+    with dspy.context(lm=dspy.LM("openai/gpt-4o-mini")):
+        assert cache_key(MOCK_TASK_ID, "source", "agent") != key
+    assert cache_key(MOCK_TASK_ID, "source", "agent") == key
+
+
+@pytest.mark.parametrize("setting, value", [
+    ("MAX_ANSWER_TOKENS", 4000),
+    ("TRIM_HEAD_CHARS", 3000),
+    ("TRIM_TAIL_CHARS", 1000),
+    ("cheap_lm", dspy.LM("openai/gpt-4.1-nano")),
+])
+def test_cache_key_covers_answer_bounding(monkeypatch, setting, value):
+    """Test that changing how answers are trimmed or summarized does not reuse earlier cached scores."""
+    key = cache_key(MOCK_TASK_ID, "source", "agent")
+    monkeypatch.setattr(eval, setting, value)
+    assert cache_key(MOCK_TASK_ID, "source", "agent") != key
+
+
+def test_cache_write_failure_keeps_evaluation(tmp_path, monkeypatch, stub_evaluator):
+    """Test that a cache that cannot be written to neither fails the evaluation nor leaves temp files behind."""
+    task = get_task(MOCK_TASK_ID)
+    
+    not_a_dir = tmp_path / "cache"
+    not_a_dir.write_text("")
+    monkeypatch.setattr(eval, "CACHE_DIR", not_a_dir)
+    result = evaluate_task(task, agent_answer="An answer.")
+    assert "error" not in result.details
+    assert result.score == 0.8
+    
+    cache_dir = tmp_path / "eval_cache"
+    monkeypatch.setattr(eval, "CACHE_DIR", cache_dir)
+    def fail_replace(src, dst):
+        raise OSError("disk full")
+    monkeypatch.setattr(eval.os, "replace", fail_replace)
+    result = evaluate_task(task, agent_answer="Another answer.")
+    assert "error" not in result.details
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_main_resumes_from_partial_results(tmp_path, monkeypatch):
+    """Test that a full run skips tasks already in the partial file and never persists failed evaluations."""
     tasks = load_tasks()
+    done_id, failing_id = tasks[0].task_id, tasks[1].task_id
+    output = tmp_path / "results.json"
+    partial_path = tmp_path / "results.partial.jsonl"
+    partial_path.write_text(json.dumps({"task_id": done_id, "score": 0.5, "details": {"total_score": 50}}) + "\n")
+    env_dir = tmp_path / "env"
+    env_dir.mkdir()
+    (env_dir / "answer.txt").write_text("An answer.")
+    
+    graded = []
+    def evaluate(task_id, source_answer, agent_answer):
+        graded.append(task_id)
+        if task_id == failing_id:
+            raise RuntimeError("evaluator unavailable")
+        return dspy.Prediction(evaluation_result=STUB_EVALUATION)
+    monkeypatch.setattr(eval, "evaluator", evaluate)
+    
+    # Keep what the partial file held when main() removes it
+    persisted = []
+    unlink = Path.unlink
+    def record_unlink(path, *args, **kwargs):
+        if path == partial_path:
+            persisted.extend(json.loads(line)["task_id"] for line in path.read_text().splitlines())
+        unlink(path, *args, **kwargs)
+    monkeypatch.setattr(Path, "unlink", record_unlink)
+    
+    monkeypatch.setattr(sys, "argv", ["eval.py", "--env-path", str(env_dir), "--output", str(output), "--num-threads", "2"])
+    eval.main()
+    
+    assert sorted(graded) == sorted(task.task_id for task in tasks[1:])
+    assert failing_id not in persisted
+    assert sorted(persisted) == sorted(task.task_id for task in tasks if task.task_id != failing_id)
+    assert not partial_path.exists()
+    
+    report = json.loads(output.read_text())
+    assert report["summary"]["tasks_evaluated"] == len(tasks) - 1
+    assert report["summary"]["total_tasks"] == len(tasks)
+    assert report["summary"]["average_score"] == pytest.approx((0.5 + 0.8 * (len(tasks) - 2)) / (len(tasks) - 1))
+    assert [result["task_id"] for result in report["results"]] == [task.task_id for task in tasks]
+
+
+def run_mock_evaluations():
+    """Evaluate every mock answer, logging a breakdown and saving it to tests/eval_test_results.json."""
     
     # Find the teleprompter crash task
-    teleprompter_task = None
-    for task in tasks:
-        if task["task_id"] == "pattern_recognition_teleprompter_crash":
-            teleprompter_task = task
-            break
+    teleprompter_task = get_task(MOCK_TASK_ID)
     
     if not teleprompter_task:
-        print("❌ Could not find teleprompter crash task")
+        logger.error("❌ Could not find teleprompter crash task")
         return False
     
-    # Define mock answer files and expected score ranges
-    test_cases = [
-        {
-            "file": "tests/mock/pattern_recognition_teleprompter_crash_excellent.txt",
-            "expected_min": 0.75,  # Should score 75%+
-            "expected_max": 1.0,
-            "description": "Excellent answer"
-        },
-        {
-            "file": "tests/mock/pattern_recognition_teleprompter_crash_good.txt", 
-            "expected_min": 0.60,  # Should score 60-79%
-            "expected_max": 0.79,
-            "description": "Good answer"
-        },
-        {
-            "file": "tests/mock/pattern_recognition_teleprompter_crash_fair.txt",
-            "expected_min": 0.40,  # Should score 40-65%
-            "expected_max": 0.65,
-            "description": "Fair answer"
-        },
-        {
-            "file": "tests/mock/pattern_recognition_teleprompter_crash_poor.txt",
-            "expected_min": 0.0,   # Should score 0-24%
-            "expected_max": 0.24,
-            "description": "Poor answer"
-        }
-    ]
+    test_cases = MOCK_CASES
     
     results = []
     all_passed = True
     
-    print("🧪 Testing evaluation system with mock answers...")
-    print()
+    logger.info("🧪 Testing evaluation system with mock answers...")
+    logger.info("")
+    
+    # Read each mock answer once (None if missing) and hand its text to the evaluation
+    agent_answers = []
+    for test_case in test_cases:
+        try:
+            agent_answers.append(test_case.file.read_text())
+        except FileNotFoundError:
+            agent_answers.append(None)
     
-    for i, test_case in enumerate(test_cases, 1):
-        print(f"Test {i}: {test_case['description']}")
+    # The evaluations are independent LLM calls, so run them concurrently
+    async def evaluate_all():
+        return await asyncio.gather(
+            *(evaluate_task_async(teleprompter_task, agent_answer=agent_answer)
+              for agent_answer in agent_answers if agent_answer is not None),
+            return_exceptions=True
+        )
+    
+    evaluations = iter(asyncio.run(evaluate_all()))
+    
+    for i, (test_case, agent_answer) in enumerate(zip(test_cases, agent_answers), 1):
+        # Each case's report is collected and logged as a single record
+        lines = [f"Test {i}: {test_case.description}"]
+        level = logging.INFO
         
-        # Check if mock file exists
-        if not Path(test_case["file"]).exists():
-            print(f"❌ Mock file not found: {test_case['file']}")
+        if agent_answer is None:
+            lines.append(f"❌ Mock file not found: {test_case.file}")
+            logger.error("\n".join(lines))
             all_passed = False
             continue
         
         try:
-            # Run evaluation
-            result = evaluate_task(
-                teleprompter_task,
-                agent_answer_path=test_case["file"]
-            )
+            result = next(evaluations)
+            if isinstance(result, Exception):
+                raise result
             
             score = result.score
-            expected_min = test_case["expected_min"]
-            expected_max = test_case["expected_max"]
+            expected_min = test_case.expected_min
+            expected_max = test_case.expected_max
             
             # Check if score is in expected range
             if expected_min <= score <= expected_max:
                 status = "✅ PASS"
             else:
                 status = "❌ FAIL"
+                level = logging.ERROR
                 all_passed = False
             
-            print(f"  Score: {score:.2f} (expected: {expected_min:.2f}-{expected_max:.2f}) {status}")
+            lines.append(f"  Score: {score:.2f} (expected: {expected_min:.2f}-{expected_max:.2f}) {status}")
             
             # Show breakdown
             details = result.details
-            print(f"    Pattern Recognition: {details['pattern_recognition']}/25")
-            print(f"    Specific Evidence: {details['specific_evidence']}/25") 
-            print(f"    Root Cause Analysis: {details['root_cause_analysis']}/25")
-            print(f"    Actionable Insights: {details['actionable_insights']}/25")
-            print(f"    Total: {details['total_score']}/100")
-            print()
+            lines.append(f"    Pattern Recognition: {details['pattern_recognition']}/25")
+            lines.append(f"    Specific Evidence: {details['specific_evidence']}/25")
+            lines.append(f"    Root Cause Analysis: {details['root_cause_analysis']}/25")
+            lines.append(f"    Actionable Insights: {details['actionable_insights']}/25")
+            lines.append(f"    Total: {details['total_score']}/100")
             
             results.append({
-                "test_case": test_case["description"],
+                "test_case": test_case.description,
                 "score": score,
                 "expected_range": f"{expected_min:.2f}-{expected_max:.2f}",
                 "passed": expected_min <= score <= expected_max,
@@ -115,92 +313,101 @@ def test_evaluation_with_mock_answers():
             })
             
         except Exception as e:
-            print(f"❌ ERROR: {e}")
+            lines.append(f"❌ ERROR: {e}")
+            level = logging.ERROR
             all_passed = False
             results.append({
-                "test_case": test_case["description"],
+                "test_case": test_case.description,
                 "error": str(e),
                 "passed": False
             })
-            print()
+        
+        lines.append("")
+        logger.log(level, "\n".join(lines))
     
     # Save detailed results
-    results_file = Path("tests/eval_test_results.json")
-    with open(results_file, 'w') as f:
-        json.dump({
-            "summary": {
-                "all_tests_passed": all_passed,
-                "total_tests": len(test_cases),
-                "passed_tests": sum(1 for r in results if r.get("passed", False))
-            },
-            "results": results
-        }, f, indent=2)
-    
-    print(f"📄 Detailed results saved to: {results_file}")
+    # Serialized in one call and written at once, rather than json.dump's many small writes
+    passed_count = sum(1 for r in results if r.get("passed", False))
+    payload = {
+        "summary": {
+            "all_tests_passed": all_passed,
+            "total_tests": len(test_cases),
+            "passed_tests": passed_count
+        },
+        "results": results
+    }
+    results_file = TESTS_DIR / "eval_test_results.json"
+    results_file.write_text(json.dumps(payload, indent=2))
+    
+    logger.info(f"📄 Detailed results saved to: {results_file}")
     
     # Final summary
-    passed_count = sum(1 for r in results if r.get("passed", False))
-    print(f"\n📊 Summary: {passed_count}/{len(test_cases)} tests passed")
+    logger.info(f"\n📊 Summary: {passed_count}/{len(test_cases)} tests passed", extra={"results": results})
     
     if all_passed:
-        print("🎉 All tests passed! Evaluation system is working correctly.")
+        logger.info("🎉 All tests passed! Evaluation system is working correctly.")
     else:
-        print("⚠️  Some tests failed. Check the results above.")
+        logger.warning("⚠️  Some tests failed. Check the results above.")
     
     return all_passed
 
 
-def test_basic_functionality():
-    """Test basic functionality of the evaluation system."""
-    print("🔧 Testing basic evaluation functionality...")
+def check_basic_functionality():
+    """Check that tasks load and every task has a source answer, logging each check."""
+    logger.info("🔧 Testing basic evaluation functionality...")
     
     try:
         # Test loading tasks
         tasks = load_tasks()
-        print(f"✅ Successfully loaded {len(tasks)} tasks")
+        logger.info(f"✅ Successfully loaded {len(tasks)} tasks")
+        
+        # Test that all required files exist, listing the source answers directory once
+        source_dir = SOURCE_ANSWERS_DIR
+        with os.scandir(source_dir) as entries:
+            source_files = {entry.name for entry in entries if entry.is_file()}
         
-        # Test that all required files exist
         for task in tasks:
-            task_id = task["task_id"]
-            source_file = Path(f"dataset_from_dspy/source_answers/{task_id}.md")
-            if not source_file.exists():
-                print(f"❌ Missing source answer: {source_file}")
+            task_id = task.task_id
+            if f"{task_id}.md" not in source_files:
+                logger.error(f"❌ Missing source answer: {source_dir / f'{task_id}.md'}")
                 return False
             else:
-                print(f"✅ Found source answer: {task_id}")
+                logger.info(f"✅ Found source answer: {task_id}")
         
         return True
         
     except Exception as e:
-        print(f"❌ Basic functionality test failed: {e}")
+        logger.error(f"❌ Basic functionality test failed: {e}")
         return False
 
 
 def main():
     """Run all tests."""
-    print("🚀 Starting git-qa-benchmark evaluation tests")
-    print("=" * 50)
-    print()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
+    logger.info("🚀 Starting git-qa-benchmark evaluation tests")
+    logger.info("=" * 50)
+    logger.info("")
     
     # Test basic functionality first
-    basic_test_passed = test_basic_functionality()
-    print()
+    basic_test_passed = check_basic_functionality()
+    logger.info("")
     
     if not basic_test_passed:
-        print("❌ Basic functionality tests failed. Stopping.")
+        logger.error("❌ Basic functionality tests failed. Stopping.")
         sys.exit(1)
     
     # Test with mock answers
-    mock_test_passed = test_evaluation_with_mock_answers()
+    mock_test_passed = run_mock_evaluations()
     
-    print()
-    print("=" * 50)
+    logger.info("")
+    logger.info("=" * 50)
     
     if basic_test_passed and mock_test_passed:
-        print("🎉 All tests passed! Evaluation system is ready to use.")
+        logger.info("🎉 All tests passed! Evaluation system is ready to use.")
         sys.exit(0)
     else:
-        print("❌ Some tests failed. Please check the output above.")
+        logger.error("❌ Some tests failed. Please check the output above.")
         sys.exit(1)
 
 
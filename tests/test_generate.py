@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Tests for the offline parts of the GitHub task generator.
+"""
+
+import json
+
+import pytest
+
+import generate
+from generate import (
+    GitHubQATask, build_graphql_query, deduplicate_tasks, fetch_github_data, format_issue_as_xml, format_pr_as_xml,
+    graphql_node_to_rest, respect_rate_limit, stream_json_array
+)
+
+CRASH_TASK = (
+    "What recurring pattern caused the BootstrapFewShot teleprompter to crash when given "
+    "empty trainsets, and how was it fixed across PRs?"
+)
+CRASH_TASK_REWORDED = (
+    "What recurring pattern caused the BootstrapFewShot teleprompter to crash on "
+    "empty trainsets, and how was it fixed across pull requests?"
+)
+EXPERTISE_TASK = "Which contributors have the most expertise in the caching layer of the LM client, based on commit history?"
+TIMELINE_TASK = (
+    "How did the async support in dspy.Predict evolve over time, and which phases and "
+    "challenges are visible in the git history?"
+)
+
+
+PRS = [
+    {"number": 101, "title": "Fix crash on empty trainset", "body": "Closes #99.\n\nGuard the loop.", "labels": ["bug"]},
+    {"number": 102, "title": "Add async Predict", "body": None, "comments": [{"user": "dev", "body": "LGTM, [] ok"}]},
+]
+CHUNK_SIZES = (1, 2, 7)
+
+
+class FakeResponse:
+    """The parts of requests.Response the GitHub fetchers read."""
+    
+    def __init__(self, payload, status_code=200, remaining=5000):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = json.dumps(payload)
+        self.headers = {"X-RateLimit-Remaining": str(remaining), "X-RateLimit-Reset": "0"}
+    
+    def json(self):
+        return self.payload
+
+
+def graphql_page(numbers, end_cursor, has_next_page, remaining=5000):
+    """A GraphQL response listing PRs with the given numbers."""
+    nodes = [{"number": number, "title": f"PR {number}", "state": "OPEN", "merged": False} for number in numbers]
+    connection = {"nodes": nodes, "pageInfo": {"hasNextPage": has_next_page, "endCursor": end_cursor}}
+    return FakeResponse({"data": {"repository": {"items": connection}}}, remaining=remaining)
+
+
+@pytest.fixture
+def github(monkeypatch):
+    """Serve queued fake responses to the generator's GitHub session, recording each request."""
+    responses, sent_requests = [], []
+    
+    def respond(url, **kwargs):
+        sent_requests.append(kwargs)
+        return responses.pop(0)
+    
+    monkeypatch.setattr(generate.session, "get", respond)
+    monkeypatch.setattr(generate.session, "post", respond)
+    monkeypatch.setattr(generate.time, "sleep", lambda seconds: None)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    return responses, sent_requests
+
+
+def make_tasks(*texts):
+    """Build generated tasks with the given questions."""
+    return [GitHubQATask(task_id=f"task_{i}", task=text, success_criteria="") for i, text in enumerate(texts)]
+
+
+def test_deduplicate_identical_tasks():
+    """Test that identical questions collapse to the first one, however many there are."""
+    for count in (2, 3):
+        kept = deduplicate_tasks(make_tasks(*[CRASH_TASK] * count))
+        assert [task.task_id for task in kept] == ["task_0"]
+
+
+def test_deduplicate_near_duplicate_tasks():
+    """Test that a reworded copy of a question is removed while distinct questions are kept."""
+    kept = deduplicate_tasks(make_tasks(CRASH_TASK, EXPERTISE_TASK, CRASH_TASK_REWORDED))
+    assert [task.task_id for task in kept] == ["task_0", "task_1"]
+
+
+def test_deduplicate_keeps_distinct_tasks():
+    """Test that unrelated questions are all kept."""
+    kept = deduplicate_tasks(make_tasks(CRASH_TASK, EXPERTISE_TASK, TIMELINE_TASK))
+    assert len(kept) == 3
+
+
+def stream_file(tmp_path, content, chunk_size):
+    """Write `content` to a file and stream its array elements back."""
+    path = tmp_path / "data.json"
+    path.write_text(content, encoding="utf-8")
+    return list(stream_json_array(path, chunk_size=chunk_size))
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("content", ["[]", "  [ ]\n"])
+def test_stream_empty_array(tmp_path, content, chunk_size):
+    """Test that an empty array yields nothing, with or without surrounding whitespace."""
+    assert stream_file(tmp_path, content, chunk_size) == []
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("indent", [None, 2])
+def test_stream_objects_spanning_chunks(tmp_path, indent, chunk_size):
+    """Test that objects spanning many chunks, with whitespace and commas at chunk boundaries, are yielded whole."""
+    content = json.dumps(PRS, indent=indent)
+    assert stream_file(tmp_path, content, chunk_size) == PRS
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+def test_stream_non_object_elements(tmp_path, chunk_size):
+    """Test that nested arrays and scalars split across chunks are not cut short."""
+    items = [[1, [2, 3]], 12345, -6.5e10, "a, ]string", True, None, []]
+    content = json.dumps(items, indent=1)
+    assert stream_file(tmp_path, content, chunk_size) == items
+
+
+@pytest.mark.parametrize("chunk_size", CHUNK_SIZES)
+@pytest.mark.parametrize("content", ['[{"number": 101}, {"numb', '[{"number": 101},', "[123"])
+def test_stream_truncated_file(tmp_path, content, chunk_size):
+    """Test that a file cut off before the closing bracket raises instead of ending silently."""
+    with pytest.raises(json.JSONDecodeError):
+        stream_file(tmp_path, content, chunk_size)
+
+
+def test_stream_rejects_non_array(tmp_path):
+    """Test that a file whose top-level value is not an array is rejected."""
+    with pytest.raises(ValueError):
+        stream_file(tmp_path, '{"number": 101}', 2)
+
+
+def test_fetch_failure_keeps_partial_data(tmp_path, github):
+    """Test that a failed or rate-limited fetch is resumed on the next run instead of being saved as complete."""
+    responses, sent_requests = github
+    save_path = tmp_path / "pr.json"
+    partial_path = tmp_path / "pr.jsonl"
+    
+    responses.append(FakeResponse({"message": "rate limited"}, status_code=403))
+    assert fetch_github_data("o", "r", "pulls", save_path, fetch_comments_flag=False) == []
+    assert not save_path.exists()
+    
+    responses.append(FakeResponse([{"number": 2}, {"number": 1}], remaining=5))
+    assert [item["number"] for item in fetch_github_data("o", "r", "pulls", save_path, fetch_comments_flag=False)] == [2, 1]
+    assert not save_path.exists()
+    assert partial_path.exists()
+    
+    responses.extend([FakeResponse([{"number": 3}, {"number": 2}, {"number": 1}]), FakeResponse([])])
+    assert [item["number"] for item in fetch_github_data("o", "r", "pulls", save_path, fetch_comments_flag=False)] == [2, 1, 3]
+    assert [item["number"] for item in json.loads(save_path.read_text())] == [2, 1, 3]
+    assert not partial_path.exists()
+
+
+def test_graphql_fetch_resumes_from_saved_cursor(tmp_path, github, monkeypatch):
+    """Test that a GraphQL fetch stopped by the rate limit continues after the last saved page."""
+    responses, sent_requests = github
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    save_path = tmp_path / "pr.json"
+    
+    responses.append(graphql_page([2, 1], "cursor-1", has_next_page=True, remaining=5))
+    fetch_github_data("o", "r", "pulls", save_path, fetch_comments_flag=False)
+    assert not save_path.exists()
+    
+    responses.append(graphql_page([0], "cursor-2", has_next_page=False))
+    items = fetch_github_data("o", "r", "pulls", save_path, fetch_comments_flag=False)
+    
+    assert [request["json"]["variables"]["cursor"] for request in sent_requests] == [None, "cursor-1"]
+    assert [item["number"] for item in items] == [2, 1, 0]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["pr.json"]
+
+
+def test_rate_limit_schedule_is_shared(monkeypatch):
+    """Test that throttled calls are spaced on one shared schedule, not paced independently per thread."""
+    sleeps = []
+    monkeypatch.setattr(generate.time, "time", lambda: 1000.0)
+    monkeypatch.setattr(generate.time, "sleep", sleeps.append)
+    monkeypatch.setattr(generate, "next_request_time", 0.0)
+    
+    # 10 requests left over the 100 seconds until the reset: one every 10 seconds
+    response = FakeResponse([], remaining=10)
+    response.headers["X-RateLimit-Reset"] = "1100"
+    for _ in range(3):
+        respect_rate_limit(response)
+    
+    assert sleeps == [0.0, 10.0, 20.0]
+
+
+def test_failed_comment_fetch_is_retried(tmp_path, github):
+    """Test that an item whose comments could not be fetched is not saved as having none."""
+    responses, sent_requests = github
+    save_path = tmp_path / "issues.json"
+    
+    responses.extend([FakeResponse([{"number": 7}]), FakeResponse({"message": "rate limited"}, status_code=403)])
+    assert fetch_github_data("o", "r", "issues", save_path) == []
+    assert not save_path.exists()
+    
+    responses.extend([FakeResponse([{"number": 7}]), FakeResponse([{"body": "Fixed in #8."}]), FakeResponse([])])
+    items = fetch_github_data("o", "r", "issues", save_path)
+    assert items == [{"number": 7, "comments": [{"body": "Fixed in #8."}]}]
+
+
+def test_graphql_pr_state_and_author():
+    """Test that merged PRs map to REST's closed state and a deleted author to an empty user."""
+    merged = graphql_node_to_rest({"number": 5, "state": "MERGED", "merged": True, "author": None}, "pulls")
+    assert merged["state"] == "closed"
+    assert merged["merged"] is True
+    assert merged["user"] == {}
+    assert "labels" not in merged
+    
+    opened = graphql_node_to_rest({"number": 6, "state": "OPEN", "author": {"login": "dev"}}, "pulls")
+    assert opened["state"] == "open"
+    assert opened["user"] == {"login": "dev"}
+
+
+def test_graphql_comments_and_labels():
+    """Test that review comments follow issue comments and that only issues get labels."""
+    comment = {"author": {"login": "dev"}, "body": "Issue comment", "createdAt": "2024-01-01T00:00:00Z"}
+    review_comment = {"author": None, "body": "Review comment", "createdAt": "2024-01-02T00:00:00Z"}
+    pr = graphql_node_to_rest({
+        "number": 5,
+        "comments": {"nodes": [comment]},
+        "reviews": {"nodes": [{"comments": {"nodes": [review_comment]}}]},
+    }, "pulls")
+    assert pr["comments"] == [
+        {"user": {"login": "dev"}, "created_at": "2024-01-01T00:00:00Z", "body": "Issue comment"},
+        {"user": {}, "created_at": "2024-01-02T00:00:00Z", "body": "Review comment"},
+    ]
+    
+    issue = graphql_node_to_rest({"number": 7, "labels": {"nodes": [{"name": "bug"}]}}, "issues")
+    assert issue["labels"] == [{"name": "bug"}]
+
+
+def test_graphql_query_without_comments():
+    """Test that skipping comments leaves them out of both the query and the mapped items."""
+    assert "comments(" not in build_graphql_query("pulls", fetch_comments_flag=False)
+    assert "reviews(" in build_graphql_query("pulls", fetch_comments_flag=True)
+    assert "reviews(" not in build_graphql_query("issues", fetch_comments_flag=True)
+    assert "comments" not in graphql_node_to_rest({"number": 5}, "pulls")
+
+
+def test_graphql_fetch_saves_complete_data(tmp_path, github, monkeypatch):
+    """Test that a finished GraphQL fetch writes save_path and removes the JSON Lines file."""
+    responses, sent_requests = github
+    monkeypatch.setenv("GITHUB_TOKEN", "token")
+    save_path = tmp_path / "pr.json"
+    responses.extend([graphql_page([3, 2], "cursor-1", has_next_page=True), graphql_page([1], "cursor-2", has_next_page=False)])
+    
+    items = fetch_github_data("o", "r", "pulls", save_path)
+    
+    assert [item["number"] for item in items] == [3, 2, 1]
+    assert json.loads(save_path.read_text()) == items
+    assert not (tmp_path / "pr.jsonl").exists()
+    assert "comments(" in sent_requests[0]["json"]["query"]
+
+
+def test_xml_escapes_user_text():
+    """Test that markup in titles, bodies, comments and labels is escaped rather than injected into the prompt."""
+    pr = format_pr_as_xml({
+        "number": 5,
+        "title": "Handle <empty> & missing trainsets",
+        "user": {"login": "dev"},
+        "body": "</body><title>Injected</title>",
+        "comments": [{"user": {"login": "a>b"}, "body": "x < y && y > z"}],
+    })
+    assert "<title>Handle &lt;empty&gt; &amp; missing trainsets</title>" in pr
+    assert "<body>&lt;/body&gt;&lt;title&gt;Injected&lt;/title&gt;</body>" in pr
+    assert "<author>a&gt;b</author>" in pr
+    assert "<body>x &lt; y &amp;&amp; y &gt; z</body>" in pr
+    assert "Injected</title>" not in pr
+    
+    issue = format_issue_as_xml({"number": 7, "title": "t", "labels": [{"name": "<bug>"}, {"name": "a&b"}]})
+    assert "<labels>&lt;bug&gt;, a&amp;b</labels>" in issue
+
+
+def test_xml_defaults_for_missing_fields():
+    """Test that missing or null users and bodies fall back to defaults instead of raising."""
+    pr = format_pr_as_xml({"user": None, "body": None, "comments": [{"user": None, "body": None}, {}]})
+    assert "<pull_request number=\"N/A\">" in pr
+    assert "<title>No title</title>" in pr
+    assert "<body>No description</body>" in pr
+    assert pr.count("<author>unknown</author>") == 3
+    assert pr.count("<body>No content</body>") == 2
+    
+    issue = format_issue_as_xml({"number": 7})
+    assert "<author>unknown</author>" in issue
+    assert "<labels></labels>" in issue
+    assert "<comments>" not in issue